@@ -3,6 +3,8 @@ Ticket system module for Streamlit app.
 Handles ticket creation, status tracking, and response management.
 """
 
+import streamlit as st
+
 from .ticket_manager import TicketManager
 from .smart_refresh import (
     init_smart_refresh,
@@ -20,6 +22,13 @@ from .ticket_forms import (
 )
 from .ticket_processing import process_ticket_with_ai
 
+
+@st.cache_resource
+def get_ticket_manager() -> TicketManager:
+    """Return the process-wide TicketManager shared by all sessions."""
+    return TicketManager()
+
+
 def show_ticket_interface():
     """Display the main ticket interface."""
     import streamlit as st
@@ -30,6 +39,10 @@ def show_ticket_interface():
     # Initialize smart refresh system
     init_smart_refresh()
     
+    # Initialize ticket manager (the smart refresh check below reads from it)
+    if "ticket_manager" not in st.session_state:
+        st.session_state.ticket_manager = get_ticket_manager()
+    
     # Render availability status in sidebar first
     render_availability_status()
     
@@ -83,10 +96,6 @@ def show_ticket_interface():
         show_employee_management()
         return
     
-    # Initialize ticket manager
-    if "ticket_manager" not in st.session_state:
-        st.session_state.ticket_manager = TicketManager()
-
     # Initialize workflow client
     if "workflow_client" not in st.session_state:
         st.session_state.workflow_client = WorkflowClient()
@@ -0,0 +1,119 @@
+"""
+Audio helpers for the voice call interface.
+Operates on the WAV bytes produced by the browser recorder.
+"""
+
+import io
+import wave
+
+import numpy as np
+
+
+def trim_silence(audio_bytes: bytes, threshold_db: float = -40.0, frame_ms: int = 20,
+                 lead_in_ms: int = 500, pad_ms: int = 200) -> bytes:
+    """
+    Strip leading and trailing silence from a 16-bit PCM WAV recording.
+    
+    Some ambient audio is kept in front of the speech: the speech recognizer
+    calibrates its energy threshold on the first 0.5 s of the file and discards
+    it, and the padding also keeps quiet word onsets and endings intact.
+    
+    Args:
+        audio_bytes: WAV file contents
+        threshold_db: Frames with an RMS level below this (dBFS) count as silence
+        frame_ms: Analysis frame length in milliseconds
+        lead_in_ms: Audio kept before the first voiced frame, in milliseconds
+        pad_ms: Audio kept after the last voiced frame, in milliseconds
+        
+    Returns:
+        bytes: The trimmed WAV, or the original bytes if nothing can be trimmed
+    """
+    try:
+        with wave.open(io.BytesIO(audio_bytes), 'rb') as wav:
+            params = wav.getparams()
+            pcm = wav.readframes(params.nframes)
+    except (wave.Error, EOFError):
+        return audio_bytes
+    
+    if params.sampwidth != 2:
+        return audio_bytes
+    
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    channels = params.nchannels
+    frame_len = max(1, params.framerate * frame_ms // 1000) * channels
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return audio_bytes
+    
+    # Per-frame RMS level in dBFS
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32) / 32768.0
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    voiced = np.flatnonzero(rms > 10 ** (threshold_db / 20))
+    if voiced.size == 0:
+        return audio_bytes
+    
+    first = max(0, voiced[0] - lead_in_ms // frame_ms)
+    last = voiced[-1] + 1 + pad_ms // frame_ms
+    if first == 0 and last >= n_frames:
+        return audio_bytes
+    
+    start = first * frame_len
+    end = min(len(samples), last * frame_len)
+    
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(params.sampwidth)
+        wav.setframerate(params.framerate)
+        wav.writeframes(samples[start:end].tobytes())
+    return out.getvalue()
+
+
+def to_speech_format(audio_bytes: bytes, sample_rate: int = 16000) -> bytes:
+    """
+    Down-mix a 16-bit PCM WAV recording to mono and resample it to sample_rate.
+    
+    Speech-to-text works at 16 kHz mono, so browsers that capture at 44.1/48 kHz
+    or in stereo send two to six times more bytes than needed.
+    
+    Args:
+        audio_bytes: WAV file contents
+        sample_rate: Target sample rate in Hz
+        
+    Returns:
+        bytes: The converted WAV, or the original bytes if it is already in
+        the target format or cannot be read
+    """
+    try:
+        with wave.open(io.BytesIO(audio_bytes), 'rb') as wav:
+            params = wav.getparams()
+            pcm = wav.readframes(params.nframes)
+    except (wave.Error, EOFError):
+        return audio_bytes
+    
+    if params.sampwidth != 2 or (params.nchannels == 1 and params.framerate == sample_rate):
+        return audio_bytes
+    
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    n_frames = len(samples) // params.nchannels
+    if n_frames == 0:
+        return audio_bytes
+    samples = samples[:n_frames * params.nchannels].reshape(n_frames, params.nchannels)
+    mono = samples.mean(axis=1, dtype=np.float32)
+    
+    if params.framerate != sample_rate:
+        ratio = params.framerate / sample_rate
+        if ratio > 1:
+            # Box low-pass over one output period to limit aliasing
+            width = int(np.ceil(ratio))
+            mono = np.convolve(mono, np.full(width, 1.0 / width, dtype=np.float32), mode='same')
+        out_len = max(1, int(n_frames / ratio))
+        mono = np.interp(np.arange(out_len) * ratio, np.arange(n_frames), mono)
+    
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.clip(np.round(mono), -32768, 32767).astype(np.int16).tobytes())
+    return out.getvalue()
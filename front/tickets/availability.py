@@ -92,11 +92,6 @@ def render_availability_status():
                 # Mark call as answered in database
                 db_manager.update_call_status(call['id'], 'answered')
                 
-                # Initialize vocal chat
-                if 'vocal_chat' not in st.session_state:
-                    from vocal_components import SmoothVocalChat
-                    st.session_state.vocal_chat = SmoothVocalChat()
-                
                 st.rerun()
             
             # Reject call button
@@ -2,86 +2,520 @@
 Voice call interface and processing for ticket system.
 """
 
+import base64
+import logging
 import streamlit as st
+import streamlit.components.v1 as components
+import threading
 import time
-import base64
-from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from string import Template
+from typing import Optional
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .audio_utils import to_speech_format, trim_silence
+
+logger = logging.getLogger(__name__)
+
+# Fast non-cryptographic hash for duplicate-audio detection (optional)
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Digest function picked once at import instead of branching per recording
+if XXHASH_AVAILABLE:
+    _fingerprint_digest = xxhash.xxh3_64_intdigest
+else:
+    def _fingerprint_digest(data: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+# Browser microphone widget
+try:
+    from audio_recorder_streamlit import audio_recorder
+    AUDIO_RECORDER_AVAILABLE = True
+except ImportError:
+    AUDIO_RECORDER_AVAILABLE = False
+
+# Speech-to-text / LLM / text-to-speech pipeline used during calls. The external
+# vocal_components package is preferred; otherwise the in-repo VocalAssistantAgent
+# (src/agents, which also provides the streaming pipeline) runs the call
+try:
+    from vocal_components import SmoothVocalChat as VocalChat
+    VOCAL_CHAT_AVAILABLE = True
+except ImportError:
+    try:
+        from agents.vocal_assistant import VocalAssistantAgent as VocalChat
+        VOCAL_CHAT_AVAILABLE = True
+    except ImportError:
+        VOCAL_CHAT_AVAILABLE = False
+
+# Styling for the active call banner
+_CALL_CSS = """
+<style>
+.call-interface {
+    background: linear-gradient(90deg, #28a745, #20c997);
+    color: white;
+    padding: 20px;
+    border-radius: 10px;
+    text-align: center;
+    margin-bottom: 30px;
+    animation: pulse 2s infinite;
+}
+@keyframes pulse {
+    0% { opacity: 1; }
+    50% { opacity: 0.8; }
+    100% { opacity: 1; }
+}
+</style>
+"""
+
+# Active call banner, filled in once per call by _render_call_header
+_CALL_HEADER_TEMPLATE = """
+    <div class='call-interface'>
+        <h2>📞 Active Call</h2>
+        <p><strong>Employee:</strong> {employee_name}</p>
+        <p><strong>Ticket:</strong> {ticket_subject}</p>
+        <p><strong>Ticket ID:</strong> {ticket_id}</p>
+    </div>
+    """
+
+# Icon shown before each speaker in the conversation history
+_SPEAKER_ICONS = {"You": "🎧", "Employee": "👨‍💼"}
+
+# Ticket solution saved after a call, built from the employee's last answer
+_CALL_SOLUTION_TEMPLATE = """Based on our conversation with {consulted}, here is the recommended solution:
+
+**Expert Recommendation:**
+{main_solution}
+
+**Technical Context:**
+- Issue: {issue}
+- Expert: {expert} ({role})
+- Priority: {priority}
+
+**Next Steps:**
+Please follow the expert's recommendation above. If you need further assistance, feel free to create a new support ticket.
+
+This solution was generated from a voice consultation with our technical team."""
+
+# Saved instead when the employee gave no usable answer during the call
+_CALL_SUMMARY_TEMPLATE = """A voice consultation was completed with {consulted} regarding your support request.
+
+**Issue:** {issue}
+
+**Consultation Summary:**
+Our technical expert has reviewed your case and provided guidance during the call. Please refer to any notes or instructions that were shared during the conversation.
+
+If you need additional clarification or have follow-up questions, please create a new support ticket with specific details about what you need help with.
+
+**Expert:** {expert} ({role})
+**Priority:** {priority}"""
+
+# Static part of the Maestro final-review prompt; call-specific data is appended
+_MAESTRO_REVIEW_INSTRUCTIONS = """Voice Call Solution Review
+
+Create a concise, professional email response to the customer that:
+- Starts with "Subject: Re: " followed by the original ticket subject
+- Uses a friendly greeting addressing the user by name
+- Provides a clear, direct answer based on what the employee explained
+- Includes one brief practical tip or advice if relevant
+- Credits the employee who helped (e.g., "This solution was suggested by [Employee Name], our [Role]")
+- Ends with "Best, Support Team"
+
+Keep the response SHORT and focused - no bullet points, no detailed steps, just a clear helpful answer in paragraph form.
+"""
+
+# Browser-side player for the employee's reply. Every sentence clip is sent in
+# its own zero-height component that hands it to one queue living on the parent
+# page, so clips play back to back as they arrive, playback survives reruns, and
+# the script never waits for audio to finish
+_TTS_QUEUE_SCRIPT = Template("""
+<script>
+(function () {
+  var src = "data:audio/mpeg;base64,$clip_b64";
+  try {
+    var host = window.parent;
+    if (!host.__callTtsQueue) {
+      // Built in the parent's realm so it keeps working after this iframe is removed
+      host.__callTtsQueue = new host.Function(
+        "var clips = [], seen = {}, playing = false;" +
+        "function next() {" +
+        "  if (playing || !clips.length) return;" +
+        "  playing = true;" +
+        "  var audio = new Audio(clips.shift());" +
+        "  audio.onended = audio.onerror = function () { playing = false; next(); };" +
+        "  audio.play().catch(audio.onended);" +
+        "}" +
+        "return function (id, clip) { if (seen[id]) return; seen[id] = true; clips.push(clip); next(); };"
+      )();
+    }
+    host.__callTtsQueue("$clip_id", src);
+  } catch (e) {
+    // Parent page not reachable: play the clip on its own
+    new Audio(src).play();
+  }
+})();
+</script>
+""")
+
+# Background worker for ticket writes; a single thread keeps writes to the
+# tickets file ordered
+_IO_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ticket_io")
+
+# Maestro final reviews are LLM round trips; they get their own workers so a
+# slow review never holds up other sessions' saves on _IO_POOL
+_REVIEW_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="maestro_review")
+MAESTRO_REVIEW_TIMEOUT = 60
+
+# Only this many leading bytes (plus a short tail) are hashed; the length is mixed in separately
+AUDIO_FINGERPRINT_PREFIX = 8192
+AUDIO_FINGERPRINT_SUFFIX = 64
+
+# Recording rate sent to speech-to-text (16 kHz mono speech)
+SPEECH_SAMPLE_RATE = 16000
+
+# Bounds for the per-call cache of processed recordings (TTS audio dominates the size)
+VOICE_CACHE_MAX_ENTRIES = 8
+VOICE_CACHE_MAX_BYTES = 8_000_000
+
+
+def _audio_fingerprint(audio_bytes: bytes) -> int:
+    """Return a cheap integer fingerprint used to detect re-submitted recordings."""
+    sample = audio_bytes[:AUDIO_FINGERPRINT_PREFIX] + audio_bytes[-AUDIO_FINGERPRINT_SUFFIX:]
+    return _fingerprint_digest(sample) ^ (len(audio_bytes) << 1)
+
+
+@dataclass
+class CallAudioState:
+    """Per-call recording bookkeeping, kept under one session-state key."""
+    last_process_time: float = 0.0
+    last_hash: Optional[int] = None
+    # audio fingerprint -> (transcription, response, tuple of TTS clips)
+    results: OrderedDict = field(default_factory=OrderedDict)
+    
+    def remember(self, audio_hash: int, result: tuple):
+        """Remember the result of a processed recording, within the cache bounds."""
+        self.results[audio_hash] = result
+        self.results.move_to_end(audio_hash)
+        while len(self.results) > 1 and (
+            len(self.results) > VOICE_CACHE_MAX_ENTRIES
+            or sum(len(clip) for _, _, clips in self.results.values() for clip in clips) > VOICE_CACHE_MAX_BYTES
+        ):
+            self.results.popitem(last=False)
+
+
+def _get_call_audio_state() -> CallAudioState:
+    """Return the current call's recording state, creating it on first use."""
+    state = st.session_state.get('_call_audio')
+    if state is None:
+        state = st.session_state._call_audio = CallAudioState()
+    return state
+
+
+def _get_vocal_chat():
+    """Return the session's vocal chat, creating it on first use."""
+    if not st.session_state.get('vocal_chat'):
+        if not VOCAL_CHAT_AVAILABLE:
+            raise ImportError("No vocal chat available (vocal_components or agents.vocal_assistant)")
+        st.session_state.vocal_chat = VocalChat()
+    return st.session_state.vocal_chat
+
+
+def _report_save_failure(ticket_id: str, future):
+    """Log the error of a background solution save, if it failed."""
+    def _report_failure(fut):
+        if fut.cancelled():
+            logger.warning("Saving solution for ticket %s was cancelled", ticket_id)
+            return
+        error = fut.exception()
+        if error is not None:
+            logger.error("Error saving solution for ticket %s: %s", ticket_id, error)
+    
+    future.add_done_callback(_report_failure)
+    return future
+
+
+def _save_solution_async(ticket_id: str, solution: str):
+    """Persist the call solution on the background worker without blocking the UI."""
+    future = _IO_POOL.submit(st.session_state.ticket_manager.update_employee_solution, ticket_id, solution)
+    return _report_save_failure(ticket_id, future)
+
+
+def _review_and_save_async(ticket_id: str, maestro_agent, maestro_input: str, initial_solution: str):
+    """
+    Run the Maestro final review in the background and save its result.
+    
+    The review is an LLM round trip, so it runs on its own pool and only the
+    final write goes through the ordered ticket I/O worker. The employee
+    solution is saved instead if Maestro fails, returns nothing usable or does
+    not answer within MAESTRO_REVIEW_TIMEOUT seconds.
+    """
+    ticket_manager = st.session_state.ticket_manager
+    claimed = threading.Lock()
+    
+    def save(solution: str):
+        # Whichever of the review and the timeout finishes first saves the ticket
+        if claimed.acquire(blocking=False):
+            _report_save_failure(
+                ticket_id, _IO_POOL.submit(ticket_manager.update_employee_solution, ticket_id, solution)
+            )
+    
+    def review():
+        maestro_result = maestro_agent.run({
+            "query": maestro_input,
+            "stage": "final_review",
+            "data_guardian_result": initial_solution  # Use the employee solution as the "data source"
+        })
+        
+        # Extract final solution from Maestro's response
+        final_solution = None
+        if maestro_result and isinstance(maestro_result, dict):
+            # Direct agent response format; on failure "result" holds the error message
+            if maestro_result.get("status") != "error":
+                final_solution = maestro_result.get("result")
+        elif isinstance(maestro_result, str):
+            final_solution = maestro_result
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Maestro final solution: %.200s...", final_solution)
+        # Use Maestro's final conclusion if available, otherwise fall back to initial solution
+        save(final_solution if final_solution and final_solution.strip() else initial_solution)
+    
+    def on_timeout():
+        logger.warning("Maestro review for ticket %s timed out, saving the employee solution", ticket_id)
+        save(initial_solution)
+    
+    timer = threading.Timer(MAESTRO_REVIEW_TIMEOUT, on_timeout)
+    timer.daemon = True
+    
+    def on_review_done(fut):
+        timer.cancel()
+        if not fut.cancelled() and fut.exception() is not None:
+            logger.error("Maestro review failed for ticket %s: %s", ticket_id, fut.exception())
+        # No-op if the review already saved its result
+        save(initial_solution)
+    
+    future = _REVIEW_POOL.submit(review)
+    timer.start()
+    future.add_done_callback(on_review_done)
+    return future
+
+
+def _reset_call_state():
+    """Clear the per-call session state shared by every way a call can end."""
+    st.session_state.update({'call_active': False, 'call_info': None})
+    
+    # Empty the history in place so its messages are released right away
+    history = st.session_state.get('conversation_history')
+    if isinstance(history, list):
+        history.clear()
+    else:
+        st.session_state.conversation_history = []
+    
+    # Audio de-duplication state and the cached conversation markdown
+    for key in ('_call_audio', '_conv_rendered', '_conv_rendered_len'):
+        st.session_state.pop(key, None)
+    
+    # Release the call's vocal chat so its clients and memory do not outlive the call;
+    # chats hold per-call state and are never shared between sessions
+    vocal_chat = st.session_state.pop('vocal_chat', None)
+    memory = getattr(getattr(vocal_chat, 'gemini', None), 'conversation_memory', None)
+    if isinstance(memory, list):
+        memory.clear()
+
+
+def _get_maestro_agent():
+    """Return the Maestro agent handle, looked up once per session."""
+    maestro_agent = st.session_state.get('_maestro_agent')
+    if maestro_agent is None:
+        maestro_agent = st.session_state.workflow_client.system.agents.get("maestro")
+        st.session_state._maestro_agent = maestro_agent
+    return maestro_agent
+
+
+def _scan_conversation(history, with_transcript: bool):
+    """
+    Find the last meaningful employee answer and optionally build the transcript.
+    
+    Returns:
+        tuple: (last employee answer or None, "Speaker: message" transcript or None)
+    """
+    if not with_transcript:
+        # Only the answer is needed - scan from the end and stop early
+        main_solution = next(
+            (message.strip() for speaker, message in reversed(history)
+             if speaker == "Employee" and len(message.strip()) > 10),
+            None
+        )
+        return main_solution, None
+    
+    # Transcript and answer in a single pass
+    main_solution, lines = None, []
+    for speaker, message in history:
+        lines.append(f"{speaker}: {message}")
+        if speaker == "Employee" and len(message.strip()) > 10:
+            main_solution = message.strip()
+    return main_solution, "\n".join(lines)
+
+
+def _build_call_solution(main_solution, ticket_data, employee_data) -> str:
+    """
+    Format the ticket solution from the employee's answer during the call.
+    
+    Args:
+        main_solution: The employee's last meaningful answer, or None
+        ticket_data: Ticket fields (description, priority)
+        employee_data: Employee fields (full_name, role_in_company)
+        
+    Returns:
+        str: The solution text, or a consultation summary if there was no answer
+    """
+    employee_name = employee_data.get('full_name')
+    description = ticket_data.get('description')
+    fields = {
+        'consulted': employee_name or 'our technical expert',
+        'expert': employee_name or 'Technical Specialist',
+        'role': employee_data.get('role_in_company') or 'IT Team',
+        'priority': ticket_data.get('priority', 'Medium'),
+    }
+    
+    if main_solution is not None:
+        # Format into professional solution
+        return _CALL_SOLUTION_TEMPLATE.format_map(
+            dict(fields, main_solution=main_solution, issue=description or 'Technical issue reported')
+        )
+    
+    # Fallback if no clear employee responses
+    return _CALL_SUMMARY_TEMPLATE.format_map(
+        dict(fields, issue=description or 'Technical support requested')
+    )
+
+
+def _render_call_header(call_info) -> str:
+    """Return the CSS and call banner HTML, cached per call in session state."""
+    header_key = (
+        call_info.get('employee_name', 'Unknown'),
+        call_info.get('ticket_subject', 'No subject'),
+        call_info.get('ticket_id', 'Unknown')
+    )
+    if st.session_state.get('_call_header_key') != header_key:
+        employee_name, ticket_subject, ticket_id = header_key
+        st.session_state._call_header_html = _CALL_CSS + _CALL_HEADER_TEMPLATE.format_map({
+            'employee_name': employee_name,
+            'ticket_subject': ticket_subject,
+            'ticket_id': ticket_id,
+        })
+        st.session_state._call_header_key = header_key
+    return st.session_state._call_header_html
+
+
+def _render_conversation_history() -> str:
+    """Return the conversation history as markdown, rendering only new turns."""
+    history = st.session_state.conversation_history
+    rendered_len = st.session_state.get('_conv_rendered_len', 0)
+    
+    # History was reset (new call) - start over
+    if len(history) < rendered_len:
+        rendered_len = 0
+        st.session_state._conv_rendered = ""
+    
+    if len(history) != rendered_len:
+        rendered = st.session_state.get('_conv_rendered', "")
+        for speaker, message in history[rendered_len:]:
+            rendered += f"**{_SPEAKER_ICONS.get(speaker, '👨‍💼')} {speaker}:** {message}\n\n"
+        st.session_state._conv_rendered = rendered
+        st.session_state._conv_rendered_len = len(history)
+    
+    return st.session_state.get('_conv_rendered', "")
+
+
+def _queue_tts_clip(clip: bytes, clip_id: str):
+    """Hand an MP3 clip to the browser-side playback queue; returns immediately."""
+    components.html(
+        _TTS_QUEUE_SCRIPT.substitute(clip_id=clip_id, clip_b64=base64.b64encode(clip).decode("ascii")),
+        height=0
+    )
+
+
+def _run_voice_pipeline(vocal_chat, audio_bytes, ticket_data, employee_data, conversation_history,
+                        transcription_ph, response_ph, play_clip):
+    """
+    Run speech-to-text, the employee reply and text-to-speech for one recording.
+    
+    When the vocal chat supports streaming, the transcription and the reply are
+    shown in their placeholders as soon as each stage finishes, and every reply
+    sentence is passed to play_clip(clip, index) as soon as it is synthesized,
+    so playback starts with the first sentence. play_clip must not block.
+    
+    Returns:
+        tuple: (transcription, response, tuple of TTS clips)
+    """
+    process_stream = getattr(vocal_chat, 'process_voice_input_stream', None)
+    if process_stream is None:
+        transcription, response, tts_audio_bytes = vocal_chat.process_voice_input(
+            audio_bytes, ticket_data, employee_data, conversation_history
+        )
+        if response and tts_audio_bytes:
+            play_clip(tts_audio_bytes, 0)
+        return transcription, response, (tts_audio_bytes,) if tts_audio_bytes else ()
+    
+    transcription, response, tts_clips = None, None, []
+    for delta in process_stream(audio_bytes, ticket_data, employee_data, conversation_history):
+        if delta.get('transcription'):
+            transcription = delta['transcription']
+            transcription_ph.success(f"**You said:** {transcription}")
+        if delta.get('response'):
+            response = delta['response']
+            response_ph.info(f"**Employee:** {response}")
+        if delta.get('tts_chunk'):
+            play_clip(delta['tts_chunk'], len(tts_clips))
+            tts_clips.append(delta['tts_chunk'])
+    
+    return transcription, response, tuple(tts_clips)
 
 
 def show_active_call_interface():
     """Display the active voice call interface."""
     call_info = st.session_state.call_info
     
-    # Add custom CSS for call interface
-    st.markdown("""
-    <style>
-    .call-interface {
-        background: linear-gradient(90deg, #28a745, #20c997);
-        color: white;
-        padding: 20px;
-        border-radius: 10px;
-        text-align: center;
-        margin-bottom: 30px;
-        animation: pulse 2s infinite;
-    }
-    @keyframes pulse {
-        0% { opacity: 1; }
-        50% { opacity: 0.8; }
-        100% { opacity: 1; }
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    # Call header with animation
-    st.markdown(f"""
-    <div class='call-interface'>
-        <h2>📞 Active Call</h2>
-        <p><strong>Employee:</strong> {call_info.get('employee_name', 'Unknown')}</p>
-        <p><strong>Ticket:</strong> {call_info.get('ticket_subject', 'No subject')}</p>
-        <p><strong>Ticket ID:</strong> {call_info.get('ticket_id', 'Unknown')}</p>
-    </div>
-    """, unsafe_allow_html=True)
+    # Custom CSS and call header with animation, sent as a single element.
+    # Streamlit drops elements that are not re-emitted on a rerun, so this is
+    # sent every run, but the HTML is only rebuilt when the call changes.
+    st.markdown(_render_call_header(call_info), unsafe_allow_html=True)
     
     # Initialize vocal chat if not exists
-    if not st.session_state.vocal_chat:
-        from vocal_components import SmoothVocalChat
-        st.session_state.vocal_chat = SmoothVocalChat()
+    _get_vocal_chat()
     
     # Voice interface with audio controls
-    st.markdown("### 🎤 Voice Conversation")
-    st.markdown("Speak into the microphone to discuss the ticket with the employee.")
+    st.markdown("### 🎤 Voice Conversation\n\nSpeak into the microphone to discuss the ticket with the employee.")
     
     # Audio quality controls
     with st.expander("🔧 Audio Settings", expanded=False):
-        col1, col2 = st.columns(2)
+        # Microphone sensitivity control
+        pause_threshold = st.slider(
+            "Recording Sensitivity",
+            min_value=0.5,
+            max_value=4.0,
+            value=2.0,
+            step=0.5,
+            help="Higher values = less sensitive (need louder voice)"
+        )
         
-        with col1:
-            # Microphone sensitivity control
-            pause_threshold = st.slider(
-                "Recording Sensitivity",
-                min_value=0.5,
-                max_value=4.0,
-                value=2.0,
-                step=0.5,
-                help="Higher values = less sensitive (need louder voice)"
-            )
-            
-        with col2:
-            # Sample rate for noise reduction
-            sample_rate = st.selectbox(
-                "Audio Quality",
-                options=[16000, 22050, 44100],
-                index=0,  # Default to 16000 for better noise handling
-                help="Lower rates reduce noise but may affect quality"
-            )
+        # Voice activity detection: trim silence before speech-to-text
+        vad_filter = st.checkbox(
+            "Skip silence (VAD)",
+            value=True,
+            help="Trim leading and trailing silence before transcription for faster results"
+        )
     
     # Enhanced permission reminder with audio tips
     st.info("💡 Audio Tips: Speak clearly, minimize background noise, allow microphone access, and adjust sensitivity if needed.")
     
-    # Import audio recorder
-    try:
-        from audio_recorder_streamlit import audio_recorder
-        
+    if AUDIO_RECORDER_AVAILABLE:
         # Enhanced audio recorder configuration with user controls
         audio_bytes = audio_recorder(
             text="Click to record",
@@ -90,34 +524,52 @@ def show_active_call_interface():
             icon_name="microphone",
             icon_size="3x",
             pause_threshold=pause_threshold,  # User-controlled sensitivity
-            sample_rate=sample_rate,          # User-controlled quality
+            sample_rate=SPEECH_SAMPLE_RATE,   # Native rate for speech-to-text
             key="call_audio_recorder"
         )
         
         # Improved processing - prevent duplicates but allow legitimate recordings
         if audio_bytes:
-            current_time = time.time()
-            last_process_time = st.session_state.get('last_audio_process_time', 0)
-            last_audio_hash = st.session_state.get('last_audio_hash', '')
+            # Check the call is still active before spending any work on the audio
+            if not st.session_state.get('call_active', False):
+                st.info("Call has ended. No further audio processing.")
+                return
             
-            # Create simple hash of audio to detect duplicates
-            import hashlib
-            audio_hash = hashlib.md5(audio_bytes).hexdigest()[:8]
+            current_time = time.perf_counter()
+            audio_state = _get_call_audio_state()
+            
+            # Fingerprint the raw recording (prefix + tail + length) to detect
+            # duplicates; conversion and trimming only run for audio we process
+            audio_hash = _audio_fingerprint(audio_bytes)
             
             # Allow processing if:
             # 1. More than 1 second has passed (reduced from 2), OR
             # 2. Audio content is different (different hash)
-            time_passed = (current_time - last_process_time) > 1.0
-            audio_different = audio_hash != last_audio_hash
+            time_passed = (current_time - audio_state.last_process_time) > 1.0
+            audio_different = audio_hash != audio_state.last_hash
+            
+            # The recorder hands back its last recording on every rerun; if that
+            # recording was already answered, show the answer again instead of
+            # running STT/LLM/TTS and adding it to the conversation a second time
+            cached_result = audio_state.results.get(audio_hash)
             
-            if time_passed or audio_different:
-                st.session_state.last_audio_process_time = current_time
-                st.session_state.last_audio_hash = audio_hash
+            if cached_result is not None:
+                audio_state.last_process_time = current_time
+                transcription, response, tts_clips = cached_result
+                st.success(f"**You said:** {transcription}")
+                st.info(f"**Employee:** {response}")
+                for clip in tts_clips:
+                    st.audio(clip, format='audio/mp3')
+            elif time_passed or audio_different:
+                audio_state.last_process_time = current_time
+                audio_state.last_hash = audio_hash
+                
+                # 16 kHz mono even if the browser captured at a higher rate or in stereo
+                audio_bytes = to_speech_format(audio_bytes, SPEECH_SAMPLE_RATE)
                 
-                # Check if call is still active before processing
-                if not st.session_state.get('call_active', False):
-                    st.info("Call has ended. No further audio processing.")
-                    return
+                # Drop leading/trailing silence so STT sees less audio
+                if vad_filter:
+                    audio_bytes = trim_silence(audio_bytes)
                 
                 with st.spinner("🔄 Processing voice input..."):
                     try:
@@ -130,17 +582,30 @@ def show_active_call_interface():
                         ticket_data = call_info.get('ticket_data', {})
                         employee_data = call_info.get('employee_data', {})
                         
-                        # Process voice input
-                        transcription, response, tts_audio_bytes = st.session_state.vocal_chat.process_voice_input(
+                        # Placeholders filled in as each pipeline stage finishes
+                        transcription_ph = st.empty()
+                        response_ph = st.empty()
+                        
+                        # Clip ids are unique per processing run, so the browser queue
+                        # never replays or skips a clip when a component is re-mounted
+                        clip_prefix = f"{audio_hash:x}-{time.time_ns()}"
+                        
+                        # Process voice input; reply audio starts playing in the browser
+                        # with its first sentence while later ones are synthesized
+                        transcription, response, tts_clips = _run_voice_pipeline(
+                            st.session_state.vocal_chat,
                             audio_bytes, 
                             ticket_data, 
                             employee_data, 
-                            st.session_state.conversation_history
+                            st.session_state.conversation_history,
+                            transcription_ph,
+                            response_ph,
+                            lambda clip, index: _queue_tts_clip(clip, f"{clip_prefix}-{index}")
                         )
                         
                         if transcription:
                             # Always show what was understood
-                            st.success(f"**You said:** {transcription}")
+                            transcription_ph.success(f"**You said:** {transcription}")
                             
                             # Add transcription to conversation history
                             st.session_state.conversation_history.append(("You", transcription))
@@ -148,11 +613,8 @@ def show_active_call_interface():
                             if response:
                                 # Add employee response to conversation history
                                 st.session_state.conversation_history.append(("Employee", response))
-                                st.info(f"**Employee:** {response}")
-                                
-                                # Play employee response
-                                if tts_audio_bytes:
-                                    st.audio(tts_audio_bytes, format='audio/mp3', autoplay=True)
+                                response_ph.info(f"**Employee:** {response}")
+                                audio_state.remember(audio_hash, (transcription, response, tts_clips))
                             else:
                                 # Handle case where transcription worked but response failed
                                 st.warning("🤔 The employee is thinking... Please try asking again or rephrase your question.")
@@ -172,7 +634,7 @@ def show_active_call_interface():
                 elif not audio_different:
                     st.info("🔄 Same audio detected - please record something new...")
                             
-    except ImportError:
+    else:
         st.error("❌ Audio recording not available. Please install audio-recorder-streamlit")
         st.code("pip install audio-recorder-streamlit")
     
@@ -180,9 +642,7 @@ def show_active_call_interface():
     if st.session_state.conversation_history:
         st.markdown("### 📝 Conversation History")
         with st.expander("View conversation", expanded=False):
-            for speaker, message in st.session_state.conversation_history:
-                icon = "🎧" if speaker == "You" else "👨‍💼"
-                st.markdown(f"**{icon} {speaker}:** {message}")
+            st.markdown(_render_conversation_history())
     
     # Call controls
     col1, col2 = st.columns(2)
@@ -197,16 +657,7 @@ def show_active_call_interface():
                 generate_solution_from_call()
             else:
                 # Clear all call-related session state
-                st.session_state.call_info = None
-                st.session_state.conversation_history = []
-                # Clear any ongoing processing states
-                if 'last_audio_process_time' in st.session_state:
-                    del st.session_state.last_audio_process_time
-                if 'last_audio_hash' in st.session_state:
-                    del st.session_state.last_audio_hash
-                st.rerun()
-                st.session_state.call_info = None
-                st.session_state.conversation_history = []
+                _reset_call_state()
                 st.rerun()
     
     with col2:
@@ -224,137 +675,74 @@ def generate_solution_from_call():
         return
     
     try:
-        # Initialize vocal chat if needed
-        if not st.session_state.vocal_chat:
-            from vocal_components import SmoothVocalChat
-            st.session_state.vocal_chat = SmoothVocalChat()
-        
         call_info = st.session_state.call_info
         ticket_data = call_info.get('ticket_data', {})
         employee_data = call_info.get('employee_data', {})
         
-        # Generate initial solution from conversation
-        conversation_summary = "\n".join([f"{speaker}: {message}" for speaker, message in st.session_state.conversation_history])
+        # Fields shared with the Maestro prompt below
+        employee_name = employee_data.get('full_name')
+        employee_role = employee_data.get('role_in_company')
+        description = ticket_data.get('description')
+        priority = ticket_data.get('priority', 'Medium')
+        
+        # Maestro review needs the full transcript as well
+        maestro_available = bool(
+            hasattr(st.session_state, 'workflow_client') and st.session_state.workflow_client
+            and st.session_state.workflow_client.system
+        )
         
         with st.spinner("🔄 Processing conversation and generating solution..."):
             # Step 1: Generate solution without any TTS - Simple text-based approach
             # Extract the last meaningful employee response from conversation
-            employee_responses = []
-            for speaker, message in st.session_state.conversation_history:
-                if speaker == "Employee" and len(message.strip()) > 10:
-                    employee_responses.append(message.strip())
+            main_solution, conversation_summary = _scan_conversation(
+                st.session_state.conversation_history,
+                with_transcript=maestro_available
+            )
             
             # Create a professional solution based on employee responses
-            if employee_responses:
-                # Use the most recent and comprehensive employee response
-                main_solution = employee_responses[-1]
-                
-                # Format into professional solution
-                initial_solution = f"""Based on our conversation with {employee_data.get('full_name', 'our technical expert')}, here is the recommended solution:
-
-**Expert Recommendation:**
-{main_solution}
-
-**Technical Context:**
-- Issue: {ticket_data.get('description', 'Technical issue reported')}
-- Expert: {employee_data.get('full_name', 'Technical Specialist')} ({employee_data.get('role_in_company', 'IT Team')})
-- Priority: {ticket_data.get('priority', 'Medium')}
-
-**Next Steps:**
-Please follow the expert's recommendation above. If you need further assistance, feel free to create a new support ticket.
-
-This solution was generated from a voice consultation with our technical team."""
-            else:
-                # Fallback if no clear employee responses
-                initial_solution = f"""A voice consultation was completed with {employee_data.get('full_name', 'our technical expert')} regarding your support request.
-
-**Issue:** {ticket_data.get('description', 'Technical support requested')}
-
-**Consultation Summary:**
-Our technical expert has reviewed your case and provided guidance during the call. Please refer to any notes or instructions that were shared during the conversation.
-
-If you need additional clarification or have follow-up questions, please create a new support ticket with specific details about what you need help with.
-
-**Expert:** {employee_data.get('full_name', 'Technical Specialist')} ({employee_data.get('role_in_company', 'IT Team')})
-**Priority:** {ticket_data.get('priority', 'Medium')}"""
+            initial_solution = _build_call_solution(main_solution, ticket_data, employee_data)
             
             if not initial_solution:
                 st.error("Failed to generate solution from conversation.")
                 return
             
             # Step 2: Route through Maestro for comprehensive final review
-            if hasattr(st.session_state, 'workflow_client') and st.session_state.workflow_client and st.session_state.workflow_client.system:
-                # Prepare input for Maestro final review
-                maestro_input = f"""Voice Call Solution Review
-
+            if maestro_available:
+                # Prepare input for Maestro final review: fixed instructions first,
+                # then the call-specific data, so the prompt prefix is identical
+                # across calls and can be reused by the provider's prompt cache
+                maestro_input = f"""{_MAESTRO_REVIEW_INSTRUCTIONS}
 Original Ticket:
 Subject: {ticket_data.get('subject', 'No subject')}
-Description: {ticket_data.get('description', 'No description')}
-Priority: {ticket_data.get('priority', 'Medium')}
+Description: {description or 'No description'}
+Priority: {priority}
 User: {ticket_data.get('user', 'Unknown')}
 
-Employee Expert: {employee_data.get('full_name', 'Unknown')} ({employee_data.get('role_in_company', 'Employee')})
+Employee Expert: {employee_name or 'Unknown'} ({employee_role or 'Employee'})
 
 Voice Call Conversation Summary:
 {conversation_summary}
 
 Employee Solution:
-{initial_solution}
-
-Create a concise, professional email response to the customer that:
-- Starts with "Subject: Re: {ticket_data.get('subject', 'No subject')}"
-- Uses a friendly greeting addressing the user by name
-- Provides a clear, direct answer based on what the employee explained
-- Includes one brief practical tip or advice if relevant
-- Credits the employee who helped (e.g., "This solution was suggested by [Employee Name], our [Role]")
-- Ends with "Best, Support Team"
+{initial_solution}"""
 
-Keep the response SHORT and focused - no bullet points, no detailed steps, just a clear helpful answer in paragraph form."""
-
-                # Access MaestroAgent directly instead of going through full workflow
-                maestro_agent = st.session_state.workflow_client.system.agents.get("maestro")
-                if maestro_agent:
-                    # Call Maestro directly for solution synthesis only
-                    maestro_result = maestro_agent.run({
-                        "query": maestro_input,
-                        "stage": "final_review",
-                        "data_guardian_result": initial_solution  # Use the employee solution as the "data source"
-                    })
-                else:
-                    maestro_result = None
-                
-                # Extract final solution from Maestro's response
-                final_solution = None
-                if maestro_result and isinstance(maestro_result, dict):
-                    # Direct agent response format
-                    final_solution = maestro_result.get("result")
-                elif isinstance(maestro_result, str):
-                    final_solution = maestro_result
-                
-                print(f"Maestro final solution: {final_solution[:200]}...")  # Debug output
-                # Use Maestro's final conclusion if available, otherwise fall back to initial solution
-                solution_to_save = final_solution if final_solution and final_solution.strip() else initial_solution
-                
-                # Update ticket with Maestro's final solution
+                # Review and save in the background; the call page closes right away
                 ticket_id = call_info.get('ticket_id')
                 if ticket_id:
-                    st.session_state.ticket_manager.update_employee_solution(ticket_id, solution_to_save)
-                    st.success("✅ Solution reviewed by Maestro and saved to ticket!")
-                    
-                    # Show the final solution
-                    st.markdown("### 📝 Final Solution (Reviewed by Maestro)")
-                    st.success(solution_to_save)
-                    
-                    if final_solution and final_solution != initial_solution:
-                        with st.expander("View Original Employee Solution"):
-                            st.info(initial_solution)
+                    maestro_agent = _get_maestro_agent()
+                    if maestro_agent:
+                        _review_and_save_async(ticket_id, maestro_agent, maestro_input, initial_solution)
+                        st.success("✅ Call ended. Maestro is reviewing the solution and will save it to the ticket.")
+                    else:
+                        _save_solution_async(ticket_id, initial_solution)
+                        st.success("✅ Solution generated and saved to ticket!")
                 else:
                     st.error("Could not save solution: No ticket ID found.")
             else:
                 # Fallback: Save initial solution if Maestro is not available
                 ticket_id = call_info.get('ticket_id')
                 if ticket_id:
-                    st.session_state.ticket_manager.update_employee_solution(ticket_id, initial_solution)
+                    _save_solution_async(ticket_id, initial_solution)
                     st.success("✅ Solution generated and saved to ticket!")
                     st.warning("⚠️ Maestro review not available - saved employee solution directly.")
                     
@@ -366,27 +754,10 @@ Keep the response SHORT and focused - no bullet points, no detailed steps, just
     
     except Exception as e:
         st.error(f"Error generating solution: {str(e)}")
-        import traceback
-        st.error(f"Details: {traceback.format_exc()}")
+        # The page reruns right after this, so the full traceback goes to the log
+        logger.exception("Error generating solution from call")
     
     finally:
         # Ensure complete cleanup of call state
-        st.session_state.call_active = False
-        st.session_state.call_info = None
-        st.session_state.conversation_history = []
-        
-        # Clear any ongoing audio processing states
-        if 'last_audio_process_time' in st.session_state:
-            del st.session_state.last_audio_process_time
-        if 'last_audio_hash' in st.session_state:
-            del st.session_state.last_audio_hash
-        
-        # Clear any vocal chat processing states that might cause re-answering
-        if 'vocal_chat' in st.session_state and hasattr(st.session_state.vocal_chat, 'gemini'):
-            # Reset any conversation memory in the AI chat
-            try:
-                st.session_state.vocal_chat.gemini.conversation_memory = []
-            except:
-                pass
-        
+        _reset_call_state()
         st.rerun()
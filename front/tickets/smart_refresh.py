@@ -4,9 +4,8 @@ Smart refresh system for automatic ticket updates detection.
 
 import streamlit as st
 import time
-import uuid
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 
 
 def init_smart_refresh():
@@ -19,25 +18,40 @@ def init_smart_refresh():
         st.session_state.cached_ticket_state = {}
     if "refresh_notifications" not in st.session_state:
         st.session_state.refresh_notifications = []
+    if "_notification_seq" not in st.session_state:
+        st.session_state._notification_seq = 0
 
 
 def get_ticket_state_signature():
     """Get a signature of current ticket state for change detection."""
     try:
+        # Served from the ticket manager's in-memory index; no file parsing
         tickets = st.session_state.ticket_manager.load_tickets()
         username = st.session_state.username
         
-        # Create signature for different ticket views
-        user_tickets = [t for t in tickets if t["user"] == username]
-        assigned_tickets = [t for t in tickets if t.get("assigned_to") == username]
+        # Counts and latest modification times for all / user / assigned tickets in one pass
+        user_count = assigned_count = 0
+        last_modified = user_last_modified = assigned_last_modified = ""
+        for t in tickets:
+            modified = t.get("updated_at") or t.get("created_at") or ""
+            if modified > last_modified:
+                last_modified = modified
+            if t["user"] == username:
+                user_count += 1
+                if modified > user_last_modified:
+                    user_last_modified = modified
+            if t.get("assigned_to") == username:
+                assigned_count += 1
+                if modified > assigned_last_modified:
+                    assigned_last_modified = modified
         
         signature = {
             "total_count": len(tickets),
-            "user_count": len(user_tickets),
-            "assigned_count": len(assigned_tickets),
-            "last_modified": max([t.get("updated_at", t.get("created_at", "")) for t in tickets] + [""]),
-            "user_last_modified": max([t.get("updated_at", t.get("created_at", "")) for t in user_tickets] + [""]),
-            "assigned_last_modified": max([t.get("updated_at", t.get("created_at", "")) for t in assigned_tickets] + [""]),
+            "user_count": user_count,
+            "assigned_count": assigned_count,
+            "last_modified": last_modified,
+            "user_last_modified": user_last_modified,
+            "assigned_last_modified": assigned_last_modified,
         }
         return signature
     except Exception:
@@ -58,6 +72,13 @@ def check_for_ticket_updates():
     
     st.session_state.last_ticket_check = current_time
     
+    # Skip the comparison if no ticket has been written since the last poll
+    tickets_version = st.session_state.ticket_manager.version
+    if (st.session_state.cached_ticket_state
+            and tickets_version == st.session_state.get("_tickets_version")):
+        return False
+    st.session_state._tickets_version = tickets_version
+    
     # Get current ticket state
     current_signature = get_ticket_state_signature()
     cached_signature = st.session_state.cached_ticket_state
@@ -94,21 +115,19 @@ def should_skip_auto_refresh():
     if st.session_state.get("call_active", False):
         return True
     
-    # Skip if user recently submitted a form or clicked a button
-    if hasattr(st.session_state, '_form_interaction_time'):
-        if time.time() - st.session_state._form_interaction_time < 120:  # 2 minutes
+    # Skip if user is likely typing (a text widget holds unsubmitted content)
+    pending = st.session_state.get("_pending_text_keys")
+    if pending:
+        # Streamlit drops the state of widgets that were not rendered in the last run
+        # (e.g. the ticket was completed from a call), so forget those keys
+        pending.difference_update([key for key in pending if key not in st.session_state])
+        if pending:
             return True
     
-    # Skip if user is likely typing (heuristic based on text widget keys)
-    text_widget_keys = [key for key in st.session_state.keys() if key.startswith('solution_') or 'description' in key.lower()]
-    if text_widget_keys:
-        # If any text widgets have content, assume user might be typing
-        for key in text_widget_keys:
-            if hasattr(st.session_state, key) and st.session_state[key] and len(str(st.session_state[key]).strip()) > 0:
-                # Set a conservative interaction time if not already set
-                if not hasattr(st.session_state, '_form_interaction_time'):
-                    st.session_state._form_interaction_time = time.time()
-                return True
+    # Skip if user recently submitted a form or clicked a button
+    interaction_time = st.session_state.get("_form_interaction_time")
+    if interaction_time is not None and time.time() - interaction_time < 120:  # 2 minutes
+        return True
     
     return False
 
@@ -128,10 +147,11 @@ def add_refresh_notification(changes: List[str]):
     
     # Add timestamp
     timestamp = datetime.now().strftime("%H:%M:%S")
+    st.session_state._notification_seq += 1
     notification = {
         "text": notification_text.strip(),
         "timestamp": timestamp,
-        "id": str(uuid.uuid4())[:8]
+        "id": f"n{st.session_state._notification_seq}"
     }
     
     # Keep only last 3 notifications
@@ -140,6 +160,19 @@ def add_refresh_notification(changes: List[str]):
         st.session_state.refresh_notifications.pop(0)
 
 
+def _dismiss_notification(notification: Dict):
+    """Button callback: drop a notification before the rerun redraws it."""
+    notifications = st.session_state.refresh_notifications
+    if notification in notifications:
+        notifications.remove(notification)
+
+
+# Fragments (Streamlit >= 1.33) rerun only the notification area on dismiss;
+# older versions fall back to a normal full rerun
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+
+@_fragment
 def show_refresh_notifications():
     """Display refresh notifications to the user."""
     if st.session_state.refresh_notifications:
@@ -148,12 +181,8 @@ def show_refresh_notifications():
             with col1:
                 st.info(f"{notification['text']} (at {notification['timestamp']})")
             with col2:
-                if st.button("✖️", key=f"close_{notification['id']}", help="Dismiss notification"):
-                    st.session_state.refresh_notifications = [
-                        n for n in st.session_state.refresh_notifications 
-                        if n['id'] != notification['id']
-                    ]
-                    st.rerun()
+                st.button("✖️", key=f"close_{notification['id']}", help="Dismiss notification",
+                          on_click=_dismiss_notification, args=(notification,))
 
 
 def smart_refresh_controls():
@@ -6,9 +6,45 @@ Handles ticket creation and display interfaces.
 import streamlit as st
 import time
 from datetime import datetime
+from functools import lru_cache
 from database import db_manager
 
 
+# Status indicator shown in the assigned-ticket expander titles
+_ASSIGNMENT_STATUS_COLORS = {
+    "assigned": "🟡",
+    "in_progress": "🔵",
+    "completed": "🟢"
+}
+
+
+def _track_pending_text(key: str):
+    """on_change callback: remember which text widgets hold unsubmitted text.
+    
+    The auto-refresh only has to check whether this set is empty instead of
+    reading every widget value on each poll.
+    """
+    pending = st.session_state.setdefault("_pending_text_keys", set())
+    if str(st.session_state.get(key) or "").strip():
+        pending.add(key)
+    else:
+        pending.discard(key)
+
+
+# The manager argument is underscored so Streamlit does not hash it; the
+# version argument invalidates both caches whenever a ticket is written
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_user_tickets(_ticket_manager, username: str, version: tuple):
+    """Tickets created by a user, rebuilt only when the stored tickets change."""
+    return _ticket_manager.get_user_tickets(username)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_assigned_tickets(_ticket_manager, username: str, version: tuple):
+    """Tickets assigned to an employee, rebuilt only when the stored tickets change."""
+    return _ticket_manager.get_assigned_tickets(username)
+
+
 def show_create_ticket_form():
     """Display the ticket creation form."""
     st.markdown("### Create New Support Ticket")
@@ -51,8 +87,9 @@ def show_create_ticket_form():
             st.session_state._form_interaction_time = time.time()
             
             # Prevent duplicate processing by checking if this is a new submission
-            current_form_key = f"{category}_{priority}_{subject}_{description}"
-            last_form_key = st.session_state.get('_last_form_submission', '')
+            # (hash of the fields; session state lives in this process, so it is stable)
+            current_form_key = hash((category, priority, subject, description))
+            last_form_key = st.session_state.get('_last_form_submission')
             
             if subject.strip() and description.strip() and current_form_key != last_form_key:
                 # Store this submission to prevent duplicates
@@ -90,7 +127,8 @@ def show_user_tickets():
         if st.button("🔄 Refresh Tickets", key="refresh_user_tickets", help="Refresh to see latest ticket updates"):
             st.rerun()
     
-    tickets = st.session_state.ticket_manager.get_user_tickets(st.session_state.username)
+    ticket_manager = st.session_state.ticket_manager
+    tickets = _cached_user_tickets(ticket_manager, st.session_state.username, ticket_manager.version)
     
     if not tickets:
         st.info("You haven't created any tickets yet. Use the 'Create Ticket' tab to submit your first support request.")
@@ -99,6 +137,13 @@ def show_user_tickets():
     # Sort tickets by creation date (newest first)
     tickets.sort(key=lambda x: x["created_at"], reverse=True)
     
+    # Look up each assigned employee once, not once per ticket and branch
+    employees = {
+        username: db_manager.get_employee_by_username(username)
+        for username in {t.get('assigned_to') for t in tickets}
+        if username
+    }
+    
     for ticket in tickets:
         with st.expander(f"🎫 [{ticket['id']}] {ticket['subject']} - {ticket['status']}", expanded=False):
             col1, col2, col3 = st.columns(3)
@@ -113,7 +158,7 @@ def show_user_tickets():
             
             with col3:
                 if ticket.get('assigned_to'):
-                    employee = db_manager.get_employee_by_username(ticket['assigned_to'])
+                    employee = employees.get(ticket['assigned_to'])
                     if employee:
                         st.write(f"**Assigned to:** {employee['full_name']}")
                         st.write(f"**Assignment Status:** {ticket.get('assignment_status', 'assigned').title()}")
@@ -135,7 +180,7 @@ def show_user_tickets():
                 st.info(ticket['response'])
             else:
                 if ticket.get('assigned_to'):
-                    employee = db_manager.get_employee_by_username(ticket['assigned_to'])
+                    employee = employees.get(ticket['assigned_to'])
                     employee_name = employee['full_name'] if employee else ticket['assigned_to']
                     st.warning(f"⏳ {employee_name} is working on your ticket...")
                 else:
@@ -152,7 +197,8 @@ def show_assigned_tickets():
         if st.button("🔄 Refresh Assignments", key="refresh_assigned_tickets", help="Refresh to see new ticket assignments"):
             st.rerun()
     
-    assigned_tickets = st.session_state.ticket_manager.get_assigned_tickets(st.session_state.username)
+    ticket_manager = st.session_state.ticket_manager
+    assigned_tickets = _cached_assigned_tickets(ticket_manager, st.session_state.username, ticket_manager.version)
     
     if not assigned_tickets:
         st.info("No tickets are currently assigned to you.")
@@ -162,13 +208,10 @@ def show_assigned_tickets():
     assigned_tickets.sort(key=lambda x: x.get("assignment_date", ""), reverse=True)
     
     for ticket in assigned_tickets:
-        status_color = {
-            "assigned": "🟡",
-            "in_progress": "🔵", 
-            "completed": "🟢"
-        }.get(ticket.get("assignment_status", "assigned"), "⚪")
+        assignment_status = ticket.get("assignment_status", "assigned")
+        status_color = _ASSIGNMENT_STATUS_COLORS.get(assignment_status, "⚪")
         
-        with st.expander(f"{status_color} [{ticket['id']}] {ticket['subject']} - {ticket.get('assignment_status', 'assigned').title()}", expanded=False):
+        with st.expander(f"{status_color} [{ticket['id']}] {ticket['subject']} - {assignment_status.title()}", expanded=False):
             col1, col2 = st.columns(2)
             
             with col1:
@@ -193,7 +236,9 @@ def show_assigned_tickets():
                     "Your solution:",
                     placeholder="Provide a detailed solution to the user's issue...",
                     height=150,
-                    key=solution_key
+                    key=solution_key,
+                    on_change=_track_pending_text,
+                    args=(solution_key,)
                 )
                 
                 col1, col2, col3 = st.columns(3)
@@ -203,6 +248,7 @@ def show_assigned_tickets():
                         st.session_state._form_interaction_time = time.time()
                         if solution.strip():
                             st.session_state.ticket_manager.update_employee_solution(ticket['id'], solution.strip())
+                            st.session_state.get("_pending_text_keys", set()).discard(solution_key)
                             st.success("✅ Solution submitted successfully!")
                             st.rerun()
                         else:
@@ -213,13 +259,7 @@ def show_assigned_tickets():
                         # Mark interaction time to prevent auto-refresh disruption
                         st.session_state._form_interaction_time = time.time()
                         # Update assignment status to in_progress
-                        tickets = st.session_state.ticket_manager.load_tickets()
-                        for t in tickets:
-                            if t["id"] == ticket['id']:
-                                t["assignment_status"] = "in_progress"
-                                t["updated_at"] = datetime.now().isoformat()
-                                break
-                        st.session_state.ticket_manager.save_tickets(tickets)
+                        st.session_state.ticket_manager.update_assignment_status(ticket['id'], "in_progress")
                         st.success("✅ Ticket marked as in progress!")
                         st.rerun()
                 
@@ -262,8 +302,9 @@ def show_assigned_tickets():
                 st.success(ticket.get('employee_solution', 'No solution provided'))
 
 
+@lru_cache(maxsize=4096)
 def format_datetime(datetime_str: str) -> str:
-    """Format datetime string for display."""
+    """Format datetime string for display (memoized; timestamps repeat on every rerun)."""
     try:
         dt = datetime.fromisoformat(datetime_str)
         return dt.strftime("%Y-%m-%d %H:%M")
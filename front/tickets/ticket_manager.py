@@ -1,47 +1,256 @@
 """
 Ticket Manager class for handling ticket CRUD operations.
+
+Tickets are kept in memory, indexed by id, creator and assignee. Each
+mutation is appended as one JSON line to a log next to the tickets file,
+and the log is folded back into tickets.json once it grows large enough.
 """
 
 import json
+import logging
+import os
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+# Optional fast JSON parser; stdlib json is used when it is not installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Advisory file locks keep other processes out during sync/append/compaction (POSIX only)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
 # Ticket storage file
 TICKETS_FILE = Path(__file__).parent.parent / "tickets.json"
 
+# Number of logged mutations after which the log is compacted into the tickets file
+LOG_COMPACT_THRESHOLD = 500
+
+
+def read_tickets_file(path=TICKETS_FILE) -> List[Dict]:
+    """Parse the tickets file, using orjson when available.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    only need to handle the stdlib exception.
+    """
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _encode_record(record: Dict) -> bytes:
+    """Serialize one log record as a single JSON line."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record, default=str) + b"\n"
+    return json.dumps(record, default=str).encode("utf-8") + b"\n"
+
+
+def _decode_record(line: bytes) -> Dict:
+    """Parse one log line."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(line)
+    return json.loads(line)
+
 
 class TicketManager:
     """Manages ticket operations."""
-    
-    def __init__(self):
+
+    def __init__(self, tickets_file: Path = TICKETS_FILE):
+        self.tickets_file = Path(tickets_file)
+        self.log_file = self.tickets_file.with_suffix(".log")
+        self._lock = threading.RLock()
+        self._lock_depth = 0
         self.ensure_tickets_file()
-    
+        self._log = open(self.log_file, 'ab', buffering=0)
+        with self._locked():
+            self._reload()
+
+    def close(self):
+        """Close the log file handle."""
+        self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the thread lock and, across processes, an exclusive flock on the log.
+
+        Reentrant: only the outermost call takes and releases the file lock, since
+        unlocking the log file would release it for the whole instance.
+        """
+        with self._lock:
+            self._lock_depth += 1
+            try:
+                if self._lock_depth == 1 and FCNTL_AVAILABLE:
+                    fcntl.flock(self._log.fileno(), fcntl.LOCK_EX)
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and FCNTL_AVAILABLE:
+                    fcntl.flock(self._log.fileno(), fcntl.LOCK_UN)
+
     def ensure_tickets_file(self):
         """Ensure tickets file exists."""
-        if not TICKETS_FILE.exists():
-            with open(TICKETS_FILE, 'w') as f:
+        try:
+            # Exclusive create, so a concurrent process cannot clobber a file that was just written
+            with open(self.tickets_file, 'x') as f:
                 json.dump([], f)
-    
-    def load_tickets(self) -> List[Dict]:
-        """Load all tickets from storage."""
+        except FileExistsError:
+            pass
+
+    def _reload(self):
+        """Rebuild the in-memory indexes from the tickets file plus the log."""
+        self._tickets: Dict[str, Dict] = {}
+        self._by_user: Dict[str, Dict[str, Dict]] = {}
+        self._by_assignee: Dict[str, Dict[str, Dict]] = {}
         try:
-            with open(TICKETS_FILE, 'r') as f:
-                return json.load(f)
+            self._snapshot_mtime = os.stat(self.tickets_file).st_mtime_ns
+            tickets = read_tickets_file(self.tickets_file)
         except (json.JSONDecodeError, FileNotFoundError):
-            return []
-    
-    def save_tickets(self, tickets: List[Dict]):
-        """Save tickets to storage."""
-        with open(TICKETS_FILE, 'w') as f:
+            self._snapshot_mtime = None
+            tickets = []
+        for ticket in tickets:
+            self._index(ticket)
+        self._log_offset = 0
+        self._log_records = 0
+        self._replay_log()
+
+    def _replay_log(self):
+        """Apply log records written after the current offset (e.g. by another process)."""
+        try:
+            with open(self.log_file, 'rb') as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # Only consume complete lines; a partially written record is picked up next time
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(_decode_record(line))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning("Skipping malformed ticket log record: %s", e)
+            self._log_records += 1
+        self._log_offset += end
+
+    def _sync(self):
+        """Pick up changes made by other TicketManager instances since the last call."""
+        try:
+            snapshot_mtime = os.stat(self.tickets_file).st_mtime_ns
+        except FileNotFoundError:
+            snapshot_mtime = None
+        try:
+            log_size = os.stat(self.log_file).st_size
+        except FileNotFoundError:
+            log_size = 0
+        if snapshot_mtime != self._snapshot_mtime or log_size < self._log_offset:
+            # The tickets file was rewritten elsewhere (compaction or save_tickets)
+            self._reload()
+        elif log_size > self._log_offset:
+            self._replay_log()
+
+    def _index(self, ticket: Dict):
+        """Add a ticket to the id, creator and assignee indexes."""
+        ticket_id = ticket["id"]
+        self._tickets[ticket_id] = ticket
+        self._by_user.setdefault(ticket["user"], {})[ticket_id] = ticket
+        if ticket.get("assigned_to"):
+            self._by_assignee.setdefault(ticket["assigned_to"], {})[ticket_id] = ticket
+
+    def _apply(self, record: Dict):
+        """Apply one log record to the in-memory indexes."""
+        op = record["op"]
+        if op == "create":
+            self._index(record["ticket"])
+        elif op == "update":
+            ticket = self._tickets.get(record["id"])
+            if ticket is None:
+                return
+            fields = record["fields"]
+            previous_assignee = ticket.get("assigned_to")
+            ticket.update(fields)
+            if "assigned_to" in fields and fields["assigned_to"] != previous_assignee:
+                if previous_assignee:
+                    self._by_assignee.get(previous_assignee, {}).pop(ticket["id"], None)
+                if fields["assigned_to"]:
+                    self._by_assignee.setdefault(fields["assigned_to"], {})[ticket["id"]] = ticket
+
+    def _append(self, record: Dict):
+        """Apply a mutation in memory and persist it as one log line."""
+        with self._locked():
+            self._sync()
+            if record["op"] == "update" and record["id"] not in self._tickets:
+                return
+            self._apply(record)
+            line = _encode_record(record)
+            self._log.write(line)
+            end = self._log.tell()
+            # Skip our own record on replay unless another writer appended in between
+            # (only possible without fcntl); then the next _sync replays both
+            if end - len(line) == self._log_offset:
+                self._log_offset = end
+            self._log_records += 1
+            if self._log_records >= LOG_COMPACT_THRESHOLD:
+                self._write_snapshot(list(self._tickets.values()))
+
+    def _write_snapshot(self, tickets: List[Dict]):
+        """Atomically replace the tickets file and start an empty log."""
+        tmp_file = self.tickets_file.with_suffix(".json.tmp")
+        with open(tmp_file, 'w') as f:
             json.dump(tickets, f, indent=2, default=str)
-    
+        os.replace(tmp_file, self.tickets_file)
+        self._log.truncate(0)
+        self._snapshot_mtime = os.stat(self.tickets_file).st_mtime_ns
+        self._log_offset = 0
+        self._log_records = 0
+
+    def _update(self, ticket_id: str, fields: Dict):
+        """Log a field update for an existing ticket."""
+        self._append({"op": "update", "id": ticket_id, "fields": fields})
+
+    @property
+    def version(self) -> tuple:
+        """Token that changes whenever the stored tickets change; usable as a cache key."""
+        with self._locked():
+            self._sync()
+            return (self._snapshot_mtime, self._log_offset)
+
+    def load_tickets(self) -> List[Dict]:
+        """Load all tickets from storage."""
+        with self._locked():
+            self._sync()
+            return [dict(t) for t in self._tickets.values()]
+
+    def save_tickets(self, tickets: List[Dict]):
+        """Replace all stored tickets (rewrites the tickets file)."""
+        with self._locked():
+            self._write_snapshot(tickets)
+            self._reload()
+
     def create_ticket(self, user: str, category: str, priority: str, subject: str, description: str) -> str:
         """Create a new ticket."""
-        tickets = self.load_tickets()
-        
         ticket_id = str(uuid.uuid4())[:8]
+        now = datetime.now().isoformat()
         ticket = {
             "id": ticket_id,
             "user": user,
@@ -50,8 +259,8 @@ class TicketManager:
             "subject": subject,
             "description": description,
             "status": "Open",
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            "created_at": now,
+            "updated_at": now,
             "response": None,
             "response_at": None,
             "assigned_to": None,
@@ -60,63 +269,64 @@ class TicketManager:
             "employee_solution": None,
             "completion_date": None
         }
-        
-        tickets.append(ticket)
-        self.save_tickets(tickets)
+
+        self._append({"op": "create", "ticket": ticket})
         return ticket_id
-    
+
     def get_user_tickets(self, user: str) -> List[Dict]:
         """Get all tickets for a specific user."""
-        tickets = self.load_tickets()
-        return [t for t in tickets if t["user"] == user]
-    
+        with self._locked():
+            self._sync()
+            return [dict(t) for t in self._by_user.get(user, {}).values()]
+
     def get_ticket_by_id(self, ticket_id: str) -> Optional[Dict]:
         """Get a specific ticket by ID."""
-        tickets = self.load_tickets()
-        for ticket in tickets:
-            if ticket["id"] == ticket_id:
-                return ticket
-        return None
-    
+        with self._locked():
+            self._sync()
+            ticket = self._tickets.get(ticket_id)
+            return dict(ticket) if ticket is not None else None
+
     def update_ticket_response(self, ticket_id: str, response: str):
         """Update ticket with AI response."""
-        tickets = self.load_tickets()
-        for ticket in tickets:
-            if ticket["id"] == ticket_id:
-                ticket["response"] = response
-                ticket["response_at"] = datetime.now().isoformat()
-                ticket["status"] = "Responded"
-                ticket["updated_at"] = datetime.now().isoformat()
-                break
-        self.save_tickets(tickets)
-    
+        now = datetime.now().isoformat()
+        self._update(ticket_id, {
+            "response": response,
+            "response_at": now,
+            "status": "Responded",
+            "updated_at": now
+        })
+
     def assign_ticket(self, ticket_id: str, employee_username: str):
         """Assign ticket to an employee."""
-        tickets = self.load_tickets()
-        for ticket in tickets:
-            if ticket["id"] == ticket_id:
-                ticket["assigned_to"] = employee_username
-                ticket["assignment_status"] = "assigned"
-                ticket["assignment_date"] = datetime.now().isoformat()
-                ticket["status"] = "Assigned"
-                ticket["updated_at"] = datetime.now().isoformat()
-                break
-        self.save_tickets(tickets)
-    
+        now = datetime.now().isoformat()
+        self._update(ticket_id, {
+            "assigned_to": employee_username,
+            "assignment_status": "assigned",
+            "assignment_date": now,
+            "status": "Assigned",
+            "updated_at": now
+        })
+
+    def update_assignment_status(self, ticket_id: str, assignment_status: str):
+        """Update the employee-side progress of an assigned ticket."""
+        self._update(ticket_id, {
+            "assignment_status": assignment_status,
+            "updated_at": datetime.now().isoformat()
+        })
+
     def update_employee_solution(self, ticket_id: str, solution: str):
         """Update ticket with employee solution."""
-        tickets = self.load_tickets()
-        for ticket in tickets:
-            if ticket["id"] == ticket_id:
-                ticket["employee_solution"] = solution
-                ticket["assignment_status"] = "completed"
-                ticket["completion_date"] = datetime.now().isoformat()
-                ticket["status"] = "Solved"
-                ticket["updated_at"] = datetime.now().isoformat()
-                break
-        self.save_tickets(tickets)
-    
+        now = datetime.now().isoformat()
+        self._update(ticket_id, {
+            "employee_solution": solution,
+            "assignment_status": "completed",
+            "completion_date": now,
+            "status": "Solved",
+            "updated_at": now
+        })
+
     def get_assigned_tickets(self, employee_username: str) -> List[Dict]:
         """Get tickets assigned to an employee."""
-        tickets = self.load_tickets()
-        return [t for t in tickets if t.get("assigned_to") == employee_username]
+        with self._locked():
+            self._sync()
+            return [dict(t) for t in self._by_assignee.get(employee_username, {}).values()]
@@ -6,6 +6,18 @@ Handles AI-powered ticket analysis and assignment logic.
 import streamlit as st
 from database import db_manager
 
+# Keys that may hold the AI answer, in priority order ("result" is the main AISystem format)
+_RESPONSE_KEYS = ("result", "synthesis", "response", "answer", "output")
+
+
+def _extract_response(result):
+    """Return the AI answer from a workflow result (dict or plain string), or None."""
+    if isinstance(result, str):
+        return result or None
+    if isinstance(result, dict):
+        return next((result[key] for key in _RESPONSE_KEYS if result.get(key)), None)
+    return None
+
 
 def process_ticket_with_ai(ticket_id: str, subject: str, description: str):
     """Process ticket with AI workflow."""
@@ -19,17 +31,7 @@ def process_ticket_with_ai(ticket_id: str, subject: str, description: str):
             result = st.session_state.workflow_client.process_message(query)
             
             # Extract AI response from different possible formats
-            response = None
-            if result:
-                # Try different response formats
-                if isinstance(result, dict):
-                    response = (result.get("result") or       # Main format from AISystem
-                              result.get("synthesis") or 
-                              result.get("response") or 
-                              result.get("answer") or
-                              result.get("output"))
-                elif isinstance(result, str):
-                    response = result
+            response = _extract_response(result)
                 
             # Check for structured assignment data from workflow first
             workflow_result = result.get("workflow_result", {}) if isinstance(result, dict) else {}
@@ -5,12 +5,16 @@ Extracts voice components from smooth_vocal_gemini_fixed_copy.py and adapts for
 """
 import os
 import io
+import re
 import tempfile
 import requests
 import json
+import logging
 import base64
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 import speech_recognition as sr
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, Iterator, List, Tuple, Optional
 
 # Handle base agent import with fallback for standalone execution
 try:
@@ -36,16 +40,97 @@ try:
 except ImportError:
     GTTS_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
+
+def split_sentences(text: str, min_chars: int = 40) -> List[str]:
+    """Split text on sentence boundaries, merging fragments shorter than min_chars."""
+    sentences = []
+    for part in re.split(r'(?<=[.!?])\s+', text.strip()):
+        if sentences and len(sentences[-1]) < min_chars:
+            sentences[-1] = f"{sentences[-1]} {part}"
+        elif part:
+            sentences.append(part)
+    return sentences
+
 
 class CloudTTS:
-    """Google Cloud Text-to-Speech client using REST API."""
+    """
+    Google Cloud Text-to-Speech client using REST API.
+    
+    Synthesized audio is kept in a small in-memory LRU cache keyed by text.
+    The call page only benefits from it when it falls back to
+    VocalAssistantAgent; an installed vocal_components.SmoothVocalChat does
+    its own TTS, which this cache does not cover.
+    """
+    
+    # Number of recently synthesized texts kept in memory
+    CACHE_SIZE = 32
+    # Sentences synthesized in parallel by synthesize_speech_chunks
+    MAX_PARALLEL = 4
     
     def __init__(self):
         self.api_key = os.getenv("GOOGLE_API_KEY")
         self.base_url = "https://texttospeech.googleapis.com/v1/text:synthesize"
         self.client = True
+        self._cache = OrderedDict()
     
     def synthesize_speech(self, text: str) -> bytes:
+        """Synthesize speech, reusing the audio if the same text was recently synthesized."""
+        cached = self._cache_get(text)
+        if cached is not None:
+            return cached
+        
+        audio = self._synthesize(text)
+        self._cache_put(text, audio)
+        return audio
+    
+    def synthesize_speech_chunks(self, text: str) -> Iterator[bytes]:
+        """
+        Synthesize speech sentence by sentence, yielding each MP3 clip in order.
+        
+        All sentences are sent to the TTS API in parallel, so the first clip is
+        ready after one short request and later clips are usually done by the
+        time the earlier ones have played. Every clip is a complete MP3 stream
+        (whole frames) and can be played on its own.
+        """
+        # Same overall limit as synthesize_speech
+        if len(text) > 800:
+            text = text[:800] + "..."
+        
+        sentences = split_sentences(text)
+        if not sentences:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(len(sentences), self.MAX_PARALLEL),
+                                thread_name_prefix="tts") as pool:
+            # Cache lookups and updates stay on this thread; workers only call the API
+            pending = [
+                (sentence, self._cache_get(sentence) or pool.submit(self._synthesize, sentence))
+                for sentence in sentences
+            ]
+            for sentence, audio in pending:
+                if isinstance(audio, Future):
+                    audio = audio.result()
+                    self._cache_put(sentence, audio)
+                if audio:
+                    yield audio
+    
+    def _cache_get(self, text: str) -> Optional[bytes]:
+        """Return cached audio for text and mark it as recently used."""
+        cached = self._cache.get(text)
+        if cached is not None:
+            self._cache.move_to_end(text)
+        return cached
+    
+    def _cache_put(self, text: str, audio: bytes):
+        """Remember synthesized audio, evicting the least recently used entry."""
+        if audio:
+            self._cache[text] = audio
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def _synthesize(self, text: str) -> bytes:
         """Synthesize speech using Google Cloud TTS REST API."""
         try:
             # Limit text length
@@ -213,7 +298,7 @@ class VocalAssistantAgent(BaseAgent):
     def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process vocal call for assigned ticket."""
         try:
-            print(f"🎤 VocalAssistant processing voice call...")
+            logger.debug("VocalAssistant processing voice call")
             
             # Extract input data
             ticket_data = input_data.get("ticket_data", {})
@@ -277,7 +362,11 @@ class VocalAssistantAgent(BaseAgent):
             }
     
     def transcribe_audio(self, audio_bytes) -> str:
-        """Transcribe audio bytes to text using two-tier system: Google STT → Gemini AI recovery."""
+        """Transcribe audio bytes to text using two-tier system: Google STT → Gemini AI recovery.
+        
+        Silence trimming (VAD) is done by the caller on the WAV bytes, with
+        tickets.audio_utils.trim_silence, before they reach this method.
+        """
         tmp_file_path = None
         try:
             # Save audio bytes to temporary file with .wav extension
@@ -303,14 +392,14 @@ class VocalAssistantAgent(BaseAgent):
             
         except sr.UnknownValueError:
             # Google STT failed - try Gemini AI recovery
-            print("🔄 Google STT failed, attempting Gemini AI transcription recovery...")
+            logger.info("Google STT failed, attempting Gemini AI transcription recovery")
             try:
                 transcription = self._transcribe_with_gemini(tmp_file_path if tmp_file_path else audio_bytes)
                 if tmp_file_path and os.path.exists(tmp_file_path):
                     os.unlink(tmp_file_path)
                 return transcription
             except Exception as gemini_error:
-                print(f"❌ Gemini transcription also failed: {gemini_error}")
+                logger.error("Gemini transcription also failed: %s", gemini_error)
                 if tmp_file_path and os.path.exists(tmp_file_path):
                     os.unlink(tmp_file_path)
                 return "I'm having trouble understanding the audio. Could you please speak more clearly or try again?"
@@ -385,7 +474,7 @@ class VocalAssistantAgent(BaseAgent):
             raise Exception("Gemini API returned no valid transcription")
             
         except Exception as e:
-            print(f"❌ Gemini transcription failed: {e}")
+            logger.error("Gemini transcription failed: %s", e)
             raise e
     
     def _apply_context_correction(self, raw_transcription: str) -> str:
@@ -433,26 +522,43 @@ Return only the corrected text, no explanations."""
             return raw_transcription
             
         except Exception as e:
-            print(f"⚠️ Context correction failed, using raw transcription: {e}")
+            logger.warning("Context correction failed, using raw transcription: %s", e)
             return raw_transcription
     
     def process_voice_input(self, audio_bytes, ticket_data: Dict, employee_data: Dict, conversation_history: List = None) -> Tuple[str, str, Optional[bytes]]:
         """Process voice input and return transcription, response, and TTS audio."""
+        transcription, response, tts_chunks = None, None, []
+        for delta in self.process_voice_input_stream(audio_bytes, ticket_data, employee_data, conversation_history):
+            transcription = delta.get("transcription", transcription)
+            response = delta.get("response", response)
+            if delta.get("tts_chunk"):
+                tts_chunks.append(delta["tts_chunk"])
+        
+        return transcription, response, b"".join(tts_chunks) or None
+    
+    def process_voice_input_stream(self, audio_bytes, ticket_data: Dict, employee_data: Dict, conversation_history: List = None) -> Iterator[Dict[str, Any]]:
+        """
+        Process voice input, yielding each stage as soon as it is available.
+        
+        Yields dicts with one of the keys "transcription", "response" or
+        "tts_chunk", in that order, so the UI can show the transcription
+        while the reply and the audio are still being generated.
+        """
         # Transcribe audio
         transcription = self.transcribe_audio(audio_bytes)
+        yield {"transcription": transcription}
         
         if "Sorry" in transcription or "Error" in transcription:
-            return transcription, None, None
+            return
         
         # Get employee response using Gemini
         response = self.gemini.chat(transcription, ticket_data, employee_data, is_employee=True, conversation_history=conversation_history)
+        yield {"response": response}
         
-        # Generate TTS audio for employee response
-        tts_audio_bytes = None
+        # Generate TTS audio for employee response, one sentence at a time
         if response:
-            tts_audio_bytes = self.tts.synthesize_speech(response)
-        
-        return transcription, response, tts_audio_bytes
+            for chunk in self.tts.synthesize_speech_chunks(response):
+                yield {"tts_chunk": chunk}
     
     def get_system_prompt(self) -> str:
         return """You are Vocal Assistant with Anna, an AI assistant that facilitates voice calls between IT support tickets and assigned employees.
@@ -0,0 +1,94 @@
+"""
+Unit tests for the call interface audio helpers.
+"""
+
+import io
+import os
+import sys
+import wave
+
+import numpy as np
+
+# Add front to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'front'))
+
+from tickets.audio_utils import to_speech_format, trim_silence
+
+
+def make_wav(samples: np.ndarray, sample_rate: int = 16000, channels: int = 1) -> bytes:
+    """Encode int16 samples (interleaved if multi-channel) as WAV bytes."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def read_frames(audio_bytes: bytes) -> int:
+    with wave.open(io.BytesIO(audio_bytes), 'rb') as wav:
+        return wav.getnframes()
+
+
+class TestTrimSilence:
+    """Test cases for trim_silence."""
+    
+    def test_trims_leading_and_trailing_silence(self):
+        """Silence around a tone is removed."""
+        tone = (np.sin(np.arange(16000) / 5) * 10000).astype(np.int16)
+        silence = np.zeros(16000, dtype=np.int16)
+        audio = make_wav(np.concatenate([silence, tone, silence]))
+        
+        trimmed = trim_silence(audio)
+        
+        # 0.5 s lead-in + tone + 0.2 s tail padding
+        assert read_frames(trimmed) == 8000 + 16000 + 3200
+    
+    def test_keeps_calibration_lead_in(self):
+        """The recognizer's 0.5 s ambient-noise calibration window is not speech."""
+        tone = (np.sin(np.arange(16000) / 5) * 10000).astype(np.int16)
+        noise = np.random.default_rng(0).integers(-30, 30, 32000).astype(np.int16)
+        audio = make_wav(np.concatenate([noise, tone]))
+        
+        trimmed = trim_silence(audio)
+        
+        with wave.open(io.BytesIO(trimmed), 'rb') as wav:
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        # At least 0.5 s of the quiet lead-in survives before the tone starts
+        assert np.abs(samples[:8000]).max() < 100
+        assert read_frames(trimmed) >= 8000 + 16000
+    
+    def test_short_leading_silence_is_unchanged(self):
+        """Nothing is cut when the silence is shorter than the lead-in."""
+        tone = (np.sin(np.arange(16000) / 5) * 10000).astype(np.int16)
+        audio = make_wav(np.concatenate([np.zeros(4000, dtype=np.int16), tone]))
+        assert trim_silence(audio) == audio
+    
+    def test_all_silence_is_unchanged(self):
+        """A silent recording is passed through untouched."""
+        audio = make_wav(np.zeros(16000, dtype=np.int16))
+        assert trim_silence(audio) == audio
+    
+    def test_invalid_wav_is_unchanged(self):
+        """Bytes that are not a WAV file are returned as-is."""
+        assert trim_silence(b"not a wav") == b"not a wav"
+
+
+class TestToSpeechFormat:
+    """Test cases for to_speech_format."""
+    
+    def test_downsamples_and_downmixes(self):
+        """A 48 kHz stereo second becomes a 16 kHz mono second."""
+        stereo = np.full(48000 * 2, 1000, dtype=np.int16)
+        converted = to_speech_format(make_wav(stereo, sample_rate=48000, channels=2))
+        
+        with wave.open(io.BytesIO(converted), 'rb') as wav:
+            assert wav.getnchannels() == 1
+            assert wav.getframerate() == 16000
+            assert wav.getnframes() == 16000
+    
+    def test_speech_format_is_unchanged(self):
+        """16 kHz mono input is passed through untouched."""
+        audio = make_wav(np.zeros(1600, dtype=np.int16))
+        assert to_speech_format(audio) is audio
@@ -0,0 +1,277 @@
+"""
+Unit tests for the voice call interface helpers.
+"""
+
+import os
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, Mock
+
+# Add front to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'front'))
+
+from tickets import call_interface
+
+
+class StreamingChat:
+    """Fake vocal chat that yields pipeline stages like VocalAssistantAgent."""
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.calls = []
+
+    def process_voice_input_stream(self, audio_bytes, ticket_data, employee_data, conversation_history):
+        self.calls.append(audio_bytes)
+        yield from self.deltas
+
+
+class BlockingChat:
+    """Fake vocal chat without the streaming API."""
+
+    def __init__(self, result):
+        self.result = result
+
+    def process_voice_input(self, audio_bytes, ticket_data, employee_data, conversation_history):
+        return self.result
+
+
+class SessionState(dict):
+    """Dict with attribute access, like st.session_state."""
+
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+class TestRunVoicePipeline:
+    """Test cases for _run_voice_pipeline."""
+
+    def test_stream_fills_placeholders_per_stage(self):
+        """Streamed transcription and reply are shown as they arrive."""
+        chat = StreamingChat([
+            {"transcription": "My VPN drops"},
+            {"response": "Restart the client."},
+            {"tts_chunk": b"clip-1"},
+            {"tts_chunk": b"clip-2"},
+        ])
+        transcription_ph, response_ph = Mock(), Mock()
+        played = []
+
+        result = call_interface._run_voice_pipeline(
+            chat, b"wav", {}, {}, [], transcription_ph, response_ph,
+            lambda clip, index: played.append((index, clip))
+        )
+
+        assert chat.calls == [b"wav"]
+        assert result == ("My VPN drops", "Restart the client.", (b"clip-1", b"clip-2"))
+        transcription_ph.success.assert_called_once_with("**You said:** My VPN drops")
+        response_ph.info.assert_called_once_with("**Employee:** Restart the client.")
+        # Each clip is handed over as it arrives, in order, without being joined
+        assert played == [(0, b"clip-1"), (1, b"clip-2")]
+
+    def test_first_clip_plays_before_synthesis_finishes(self):
+        """Playback of sentence one is not held back by the later sentences."""
+        played = []
+
+        def deltas():
+            yield {"transcription": "Hi"}
+            yield {"response": "First. Second."}
+            yield {"tts_chunk": b"first"}
+            # The generator is only resumed after the first clip was queued
+            assert played == [b"first"]
+            yield {"tts_chunk": b"second"}
+
+        call_interface._run_voice_pipeline(
+            StreamingChat(deltas()), b"wav", {}, {}, [], Mock(), Mock(),
+            lambda clip, index: played.append(clip)
+        )
+
+        assert played == [b"first", b"second"]
+
+    def test_falls_back_to_blocking_call(self):
+        """Chats without process_voice_input_stream use process_voice_input."""
+        chat = BlockingChat(("Hello", "Hi there", b"mp3"))
+        transcription_ph, response_ph = Mock(), Mock()
+        played = []
+
+        result = call_interface._run_voice_pipeline(
+            chat, b"wav", {}, {}, [], transcription_ph, response_ph,
+            lambda clip, index: played.append((index, clip))
+        )
+
+        assert result == ("Hello", "Hi there", (b"mp3",))
+        assert played == [(0, b"mp3")]
+        transcription_ph.success.assert_not_called()
+
+
+class TestQueueTtsClip:
+    """Test cases for _queue_tts_clip."""
+
+    def test_emits_hidden_queue_component(self, monkeypatch):
+        """A clip becomes one zero-height component feeding the browser queue."""
+        html = Mock()
+        monkeypatch.setattr(call_interface.components, "html", html)
+
+        call_interface._queue_tts_clip(b"\xff\xf3mp3", "abc-0")
+
+        markup = html.call_args.args[0]
+        assert html.call_args.kwargs == {"height": 0}
+        assert '__callTtsQueue("abc-0", src)' in markup
+        assert "data:audio/mpeg;base64,//NtcDM=" in markup
+
+
+class TestCallAudioState:
+    """Test cases for the per-call voice result cache."""
+
+    def test_evicts_oldest_beyond_entry_limit(self, monkeypatch):
+        monkeypatch.setattr(call_interface, "VOICE_CACHE_MAX_ENTRIES", 2)
+        state = call_interface.CallAudioState()
+
+        for audio_hash in (1, 2, 3):
+            state.remember(audio_hash, ("said", "reply", (b"clip",)))
+
+        assert list(state.results) == [2, 3]
+
+    def test_evicts_oldest_beyond_byte_limit(self, monkeypatch):
+        monkeypatch.setattr(call_interface, "VOICE_CACHE_MAX_BYTES", 10)
+        state = call_interface.CallAudioState()
+
+        state.remember(1, ("said", "reply", (b"aaaa",)))
+        state.remember(2, ("said", "reply", (b"bbb", b"bbb")))
+        assert list(state.results) == [1, 2]
+
+        # All clips of every entry count towards the limit
+        state.remember(3, ("said", "reply", (b"cc",)))
+        assert list(state.results) == [2, 3]
+
+    def test_keeps_latest_entry_even_if_over_byte_limit(self, monkeypatch):
+        monkeypatch.setattr(call_interface, "VOICE_CACHE_MAX_BYTES", 10)
+        state = call_interface.CallAudioState()
+
+        state.remember(1, ("said", "reply", (b"a",)))
+        state.remember(2, ("said", "reply", (b"x" * 20,)))
+
+        assert list(state.results) == [2]
+
+
+class TestCachedRecording:
+    """A recording the recorder hands back again on rerun is not processed twice."""
+
+    def test_cache_hit_does_not_extend_history(self, monkeypatch):
+        recording = b"RIFF-recording"
+        history = [("You", "My VPN drops"), ("Employee", "Restart the client.")]
+        audio_state = call_interface.CallAudioState()
+        audio_state.remember(
+            call_interface._audio_fingerprint(recording),
+            ("My VPN drops", "Restart the client.", (b"clip-1", b"clip-2"))
+        )
+
+        fake_st = MagicMock()
+        fake_st.session_state = SessionState(
+            call_active=True,
+            call_info={"ticket_id": "t1"},
+            conversation_history=history,
+            vocal_chat=BlockingChat(("unused", "unused", b"")),
+            _call_audio=audio_state,
+        )
+        fake_st.columns.return_value = [MagicMock(), MagicMock()]
+        fake_st.button.return_value = False
+        pipeline = Mock()
+        monkeypatch.setattr(call_interface, "st", fake_st)
+        monkeypatch.setattr(call_interface, "AUDIO_RECORDER_AVAILABLE", True)
+        monkeypatch.setattr(call_interface, "audio_recorder", lambda **kwargs: recording, raising=False)
+        monkeypatch.setattr(call_interface, "_run_voice_pipeline", pipeline)
+
+        call_interface.show_active_call_interface()
+
+        pipeline.assert_not_called()
+        assert history == [("You", "My VPN drops"), ("Employee", "Restart the client.")]
+        assert [c.args[0] for c in fake_st.audio.call_args_list] == [b"clip-1", b"clip-2"]
+
+
+class FakeTicketManager:
+    """Records update_employee_solution calls."""
+
+    def __init__(self):
+        self.saves = []
+
+    def update_employee_solution(self, ticket_id, solution):
+        self.saves.append((ticket_id, solution))
+
+
+class FakeMaestro:
+    """Maestro stand-in returning a fixed result, raising, or blocking until released."""
+
+    def __init__(self, result=None, error=None, release=None):
+        self.result = result
+        self.error = error
+        self.release = release
+
+    def run(self, inputs):
+        if self.release is not None:
+            self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class TestReviewAndSaveAsync:
+    """Test cases for _review_and_save_async."""
+
+    def review(self, monkeypatch, maestro):
+        """Start a review and return (future, ticket manager, done event)."""
+        manager = FakeTicketManager()
+        fake_st = MagicMock()
+        fake_st.session_state = SessionState(ticket_manager=manager)
+        monkeypatch.setattr(call_interface, "st", fake_st)
+
+        future = call_interface._review_and_save_async("t1", maestro, "review this", "Employee fix")
+        # Done callbacks run in order, so this fires after the module's own callback
+        done = threading.Event()
+        future.add_done_callback(lambda fut: done.set())
+        return future, manager, done
+
+    @staticmethod
+    def flush_saves():
+        """Wait for queued writes on the ticket I/O worker."""
+        call_interface._IO_POOL.submit(lambda: None).result(5)
+
+    def test_saves_reviewed_solution(self, monkeypatch):
+        _, manager, done = self.review(monkeypatch, FakeMaestro(result={"status": "success", "result": "Reviewed fix"}))
+
+        assert done.wait(5)
+        self.flush_saves()
+        assert manager.saves == [("t1", "Reviewed fix")]
+
+    def test_error_status_saves_employee_solution(self, monkeypatch):
+        _, manager, done = self.review(monkeypatch, FakeMaestro(result={"status": "error", "result": "LLM quota"}))
+
+        assert done.wait(5)
+        self.flush_saves()
+        assert manager.saves == [("t1", "Employee fix")]
+
+    def test_exception_saves_employee_solution(self, monkeypatch):
+        _, manager, done = self.review(monkeypatch, FakeMaestro(error=RuntimeError("boom")))
+
+        assert done.wait(5)
+        self.flush_saves()
+        assert manager.saves == [("t1", "Employee fix")]
+
+    def test_timeout_saves_employee_solution_once(self, monkeypatch):
+        monkeypatch.setattr(call_interface, "MAESTRO_REVIEW_TIMEOUT", 0.05)
+        release = threading.Event()
+        _, manager, done = self.review(
+            monkeypatch, FakeMaestro(result={"status": "success", "result": "Late fix"}, release=release)
+        )
+
+        deadline = time.monotonic() + 5
+        while not manager.saves and time.monotonic() < deadline:
+            self.flush_saves()
+            time.sleep(0.01)
+        assert manager.saves == [("t1", "Employee fix")]
+
+        # The late review result must not overwrite the saved solution
+        release.set()
+        assert done.wait(5)
+        self.flush_saves()
+        assert manager.saves == [("t1", "Employee fix")]
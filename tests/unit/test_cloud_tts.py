@@ -0,0 +1,112 @@
+"""
+Unit tests for the CloudTTS cache and sentence-level synthesis.
+"""
+
+import os
+import sys
+import time
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from agents.vocal_assistant import CloudTTS, split_sentences
+
+
+def make_tts(monkeypatch, synthesize=None):
+    """CloudTTS whose API call is replaced by a stub that records the texts."""
+    tts = CloudTTS()
+    calls = []
+
+    def fake_synthesize(text):
+        calls.append(text)
+        return synthesize(text) if synthesize else f"mp3:{text}".encode()
+
+    monkeypatch.setattr(tts, "_synthesize", fake_synthesize)
+    return tts, calls
+
+
+class TestCloudTTSCache:
+    """Test cases for the CloudTTS LRU cache."""
+
+    def test_repeated_text_is_served_from_cache(self, monkeypatch):
+        tts, calls = make_tts(monkeypatch)
+
+        assert tts.synthesize_speech("Hello") == b"mp3:Hello"
+        assert tts.synthesize_speech("Hello") == b"mp3:Hello"
+        assert calls == ["Hello"]
+
+    def test_least_recently_used_entry_is_evicted(self, monkeypatch):
+        monkeypatch.setattr(CloudTTS, "CACHE_SIZE", 2)
+        tts, calls = make_tts(monkeypatch)
+
+        tts.synthesize_speech("one")
+        tts.synthesize_speech("two")
+        tts.synthesize_speech("one")  # "two" is now the oldest
+        tts.synthesize_speech("three")
+
+        assert list(tts._cache) == ["one", "three"]
+        tts.synthesize_speech("two")
+        assert calls == ["one", "two", "three", "two"]
+
+    def test_empty_audio_is_not_cached(self, monkeypatch):
+        tts, calls = make_tts(monkeypatch, synthesize=lambda text: b"")
+
+        assert tts.synthesize_speech("Hello") == b""
+        assert tts.synthesize_speech("Hello") == b""
+        assert calls == ["Hello", "Hello"]
+        assert len(tts._cache) == 0
+
+
+class TestSplitSentences:
+    """Test cases for split_sentences."""
+
+    def test_short_fragments_are_merged(self):
+        text = "Hi. Thanks for calling. Please restart the VPN client and then sign in again."
+        assert split_sentences(text) == [
+            "Hi. Thanks for calling. Please restart the VPN client and then sign in again."
+        ]
+
+    def test_long_sentences_stay_separate(self):
+        first = "Please restart the VPN client before you try again."
+        second = "If it still drops, send me the log from the settings page."
+        assert split_sentences(f"{first} {second}") == [first, second]
+
+    def test_blank_text_has_no_sentences(self):
+        assert split_sentences("   ") == []
+
+
+class TestSynthesizeSpeechChunks:
+    """Test cases for CloudTTS.synthesize_speech_chunks."""
+
+    FIRST = "Please restart the VPN client before you try again."
+    SECOND = "If it still drops, send me the log from the settings page."
+
+    def test_clips_are_yielded_in_sentence_order(self, monkeypatch):
+        # The first sentence finishes last, so completion order differs from text order
+        delays = {self.FIRST: 0.2, self.SECOND: 0.0}
+
+        def slow_synthesize(text):
+            time.sleep(delays[text])
+            return f"mp3:{text}".encode()
+
+        tts, _ = make_tts(monkeypatch, synthesize=slow_synthesize)
+
+        clips = list(tts.synthesize_speech_chunks(f"{self.FIRST} {self.SECOND}"))
+        assert clips == [f"mp3:{self.FIRST}".encode(), f"mp3:{self.SECOND}".encode()]
+
+    def test_cached_sentences_are_not_synthesized_again(self, monkeypatch):
+        tts, calls = make_tts(monkeypatch)
+        tts.synthesize_speech(self.FIRST)
+
+        list(tts.synthesize_speech_chunks(f"{self.FIRST} {self.SECOND}"))
+        assert calls == [self.FIRST, self.SECOND]
+
+    def test_long_text_is_truncated(self, monkeypatch):
+        tts, calls = make_tts(monkeypatch)
+        text = "This sentence is long enough to stand on its own here. " * 30
+
+        list(tts.synthesize_speech_chunks(text))
+
+        synthesized = " ".join(calls)
+        assert len(synthesized) <= 803
+        assert synthesized.endswith("...")
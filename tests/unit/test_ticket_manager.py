@@ -0,0 +1,129 @@
+"""
+Unit tests for the log-backed TicketManager.
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+# Add front to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'front'))
+
+from tickets import ticket_manager as ticket_manager_module
+from tickets.ticket_manager import TicketManager
+
+
+def create(manager: TicketManager, user: str = "alice") -> str:
+    return manager.create_ticket(user, "IT", "High", "Laptop", "Laptop does not boot")
+
+
+def create_many(tickets_file, user: str, count: int):
+    with TicketManager(tickets_file) as manager:
+        for _ in range(count):
+            create(manager, user)
+
+
+@pytest.fixture
+def open_manager(tmp_path):
+    """Open TicketManagers on a temporary tickets file and close them after the test."""
+    managers = []
+
+    def _open(tickets_file=None):
+        manager = TicketManager(tickets_file or tmp_path / "tickets.json")
+        managers.append(manager)
+        return manager
+
+    yield _open
+    for manager in managers:
+        manager.close()
+
+
+class TestTicketManager:
+    """Test TicketManager indexing and persistence."""
+
+    def test_create_and_lookup(self, tmp_path, open_manager):
+        manager = open_manager()
+        ticket_id = create(manager)
+
+        ticket = manager.get_ticket_by_id(ticket_id)
+        assert ticket["user"] == "alice"
+        assert ticket["status"] == "Open"
+        assert [t["id"] for t in manager.get_user_tickets("alice")] == [ticket_id]
+        assert manager.get_user_tickets("bob") == []
+
+    def test_returned_tickets_are_copies(self, tmp_path, open_manager):
+        manager = open_manager()
+        ticket_id = create(manager)
+
+        manager.get_ticket_by_id(ticket_id)["status"] = "Tampered"
+        assert manager.get_ticket_by_id(ticket_id)["status"] == "Open"
+
+    def test_assignee_index_follows_reassignment(self, tmp_path, open_manager):
+        manager = open_manager()
+        ticket_id = create(manager)
+
+        manager.assign_ticket(ticket_id, "alex01")
+        assert [t["id"] for t in manager.get_assigned_tickets("alex01")] == [ticket_id]
+
+        manager.assign_ticket(ticket_id, "sam02")
+        assert manager.get_assigned_tickets("alex01") == []
+        assert manager.get_assigned_tickets("sam02")[0]["assignment_status"] == "assigned"
+
+    def test_mutations_are_replayed_by_new_instance(self, tmp_path, open_manager):
+        tickets_file = tmp_path / "tickets.json"
+        manager = open_manager(tickets_file)
+        ticket_id = create(manager)
+        manager.assign_ticket(ticket_id, "alex01")
+        manager.update_employee_solution(ticket_id, "Reseat the RAM")
+
+        # Mutations only touch the log until compaction
+        assert json.loads(tickets_file.read_text()) == []
+
+        reopened = open_manager(tickets_file)
+        ticket = reopened.get_ticket_by_id(ticket_id)
+        assert ticket["status"] == "Solved"
+        assert ticket["employee_solution"] == "Reseat the RAM"
+
+    def test_sees_writes_from_other_instance(self, tmp_path, open_manager):
+        tickets_file = tmp_path / "tickets.json"
+        first = open_manager(tickets_file)
+        second = open_manager(tickets_file)
+        version = second.version
+
+        ticket_id = create(first)
+        assert second.get_ticket_by_id(ticket_id) is not None
+        assert second.version != version
+
+    def test_log_is_compacted(self, tmp_path, monkeypatch, open_manager):
+        monkeypatch.setattr(ticket_manager_module, "LOG_COMPACT_THRESHOLD", 3)
+        tickets_file = tmp_path / "tickets.json"
+        manager = open_manager(tickets_file)
+        ticket_id = create(manager)
+        manager.assign_ticket(ticket_id, "alex01")
+        manager.update_assignment_status(ticket_id, "in_progress")
+
+        assert manager.log_file.stat().st_size == 0
+        stored = json.loads(tickets_file.read_text())
+        assert stored[0]["assignment_status"] == "in_progress"
+        assert open_manager(tickets_file).get_ticket_by_id(ticket_id)["assigned_to"] == "alex01"
+
+    @pytest.mark.skipif(not ticket_manager_module.FCNTL_AVAILABLE
+                        or "fork" not in multiprocessing.get_all_start_methods(),
+                        reason="needs fcntl and fork")
+    def test_concurrent_processes_lose_no_records(self, tmp_path, monkeypatch, open_manager):
+        # Compact often so appends from one process race with compaction in the other
+        monkeypatch.setattr(ticket_manager_module, "LOG_COMPACT_THRESHOLD", 5)
+        tickets_file = tmp_path / "tickets.json"
+        TicketManager(tickets_file).close()
+
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=create_many, args=(tickets_file, f"user{i}", 40)) for i in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert len(open_manager(tickets_file).load_tickets()) == 120